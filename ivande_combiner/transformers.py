@@ -1,3 +1,5 @@
+from joblib import Parallel, delayed, effective_n_jobs
+import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.impute import SimpleImputer
@@ -5,6 +7,33 @@ from sklearn.preprocessing import MinMaxScaler, PowerTransformer, RobustScaler,
 
 from .utils import check_fill, check_key_tuple_empty_intersection, check_transform
 
+_CALENDAR_FEATURES = {
+    "year": lambda dti: dti.year,
+    "month": lambda dti: dti.month,
+    "day": lambda dti: dti.day,
+    "dayofweek": lambda dti: dti.dayofweek,
+    "dayofyear": lambda dti: dti.dayofyear,
+    "weekofyear": lambda dti: dti.isocalendar().week.array,
+    "hour": lambda dti: dti.hour,
+}
+
+# columns with several values among the first rows can't be constant, so only the rest are scanned in full
+_NO_INFO_HEAD_ROWS = 1024
+
+# below this width one vectorized quantile call is cheaper than dispatching threads
+_PARALLEL_QUANTILE_MIN_COLS = 32
+_PARALLEL_QUANTILE_N_CHUNKS = 8
+
+
+def _get_quantiles(X: pd.DataFrame, q: list[float], n_jobs: int = None) -> pd.DataFrame:
+    if X.shape[1] < _PARALLEL_QUANTILE_MIN_COLS or effective_n_jobs(n_jobs) == 1:
+        return X.quantile(q)
+
+    chunks = np.array_split(np.arange(X.shape[1]), _PARALLEL_QUANTILE_N_CHUNKS)
+    quantiles = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(X.iloc[:, chunk].quantile)(q) for chunk in chunks)
+
+    return pd.concat(quantiles, axis=1)
+
 
 class CalendarExtractor(BaseEstimator, TransformerMixin):
     """
@@ -29,49 +58,20 @@ class CalendarExtractor(BaseEstimator, TransformerMixin):
         self.date_cols = [col for col in X.columns if pd.api.types.is_datetime64_any_dtype(X[col])]
         return self
 
-    @staticmethod
-    def _generate_feature(X, col, feature):
-        if feature == "year":
-            s = X[col].dt.year
-            s.name = col + "_" + "year"
-        elif feature == "month":
-            s = X[col].dt.month
-            s.name = col + "_" + "month"
-        elif feature == "day":
-            s = X[col].dt.day
-            s.name = col + "_" + "day"
-        elif feature == "dayofweek":
-            s = X[col].dt.dayofweek
-            s.name = col + "_" + "dayofweek"
-        elif feature == "dayofyear":
-            s = X[col].dt.dayofyear
-            s.name = col + "_" + "dayofyear"
-        elif feature == "weekofyear":
-            s = X[col].dt.isocalendar().week
-            s.name = col + "_" + "weekofyear"
-        elif feature == "hour":
-            s = X[col].dt.hour
-            s.name = col + "_" + "hour"
-        else:
-            raise ValueError(f"unknown parameter {feature} in what_to_generate")
-
-        return s
-
     def transform(self, X):
         check_transform(X, fitted_item=self.date_cols, transformer_name=self.__class__.__name__)
 
-        X_ = X.copy()
-        cols_to_add = []
-
-        what_to_generate = ["year", "month", "day", "dayofweek", "dayofyear", "weekofyear", "hour"]
+        what_to_generate = list(_CALENDAR_FEATURES)
         if self.calendar_level is not None:
             what_to_generate = what_to_generate[: self.calendar_level]
 
+        cols_to_add = {}
         for dc in self.date_cols:
-            cols_to_add.extend([self._generate_feature(X_, dc, feature) for feature in what_to_generate])
+            dti = pd.DatetimeIndex(X[dc])
+            for feature in what_to_generate:
+                cols_to_add[dc + "_" + feature] = _CALENDAR_FEATURES[feature](dti)
 
-        X_.drop(self.date_cols, axis=1, inplace=True)
-        X_ = pd.concat([X_, *cols_to_add], axis=1)
+        X_ = pd.concat([X.drop(self.date_cols, axis=1), pd.DataFrame(cols_to_add, index=X.index)], axis=1)
 
         return X_
 
@@ -90,11 +90,10 @@ class NoInfoColsRemover(BaseEstimator, TransformerMixin):
 
     def fit(self, X, y=None):
         check_fill(X)
-        self._cols_to_remove = []
-
-        for col in X.columns:
-            if X[col].nunique() <= 1 and col not in self.cols_to_except:
-                self._cols_to_remove.append(col)
+        head_n_unique = X.head(_NO_INFO_HEAD_ROWS).nunique()
+        n_unique = X[head_n_unique.index[head_n_unique <= 1]].nunique()
+        is_no_info = (n_unique <= 1) & ~n_unique.index.isin(self.cols_to_except)
+        self._cols_to_remove = n_unique.index[is_no_info].tolist()
 
         if self.verbose and self._cols_to_remove:
             print(f"columns {self._cols_to_remove} have no info and will be removed")
@@ -117,51 +116,73 @@ class OutlierRemover(BaseEstimator, TransformerMixin):
     "std" - remove outliers by standard deviation
     "quantile" - remove outliers by quantile 0.01 and 0.99
     "skip" - do not remove outliers
+    :param n_jobs: number of threads used to compute quantiles of wide frames (32+ columns).
+        None means 1 unless set otherwise by joblib.parallel_config
     """
-    def __init__(self, cols_to_transform: list[str], method: str = "iqr"):
+    def __init__(self, cols_to_transform: list[str], method: str = "iqr", n_jobs: int = None):
         if cols_to_transform is None:
             raise ValueError("cols_to_transform parameter is should be filled")
         self.cols_to_transform = cols_to_transform
         self.method = method
+        self.n_jobs = n_jobs
         self._col_thresholds = None
+        self._lower_thresholds = None
+        self._upper_thresholds = None
 
     def fit(self, X, y=None):
         check_fill(X)
         self.cols_to_transform = [col for col in self.cols_to_transform if col in X.columns]
-        self._col_thresholds = {}
-
-        for col in self.cols_to_transform:
-            if self.method == "iqr":
-                q1 = X[col].quantile(.25)
-                q3 = X[col].quantile(.75)
-                iqr = q3 - q1
-                left_bound = q1 - 1.5 * iqr
-                right_bound = q3 + 1.5 * iqr
-            elif self.method == "std":
-                mean = X[col].mean()
-                std = X[col].std()
-                left_bound = mean - 3 * std
-                right_bound = mean + 3 * std
-            elif self.method == "quantile":
-                left_bound = X[col].quantile(.01)
-                right_bound = X[col].quantile(.99)
-            elif self.method == "skip":
-                left_bound = X[col].min()
-                right_bound = X[col].max()
-            else:
-                raise ValueError(f"unknown method {self.method} for outlier remover")
-
-            s = X[col][(X[col] >= left_bound) & (X[col] <= right_bound)]
-            self._col_thresholds[col] = (s.min(), s.max())
+        X_ = X[self.cols_to_transform]
+
+        if self.method == "iqr":
+            quantiles = _get_quantiles(X_, [.25, .75], n_jobs=self.n_jobs)
+            q1 = quantiles.loc[.25]
+            q3 = quantiles.loc[.75]
+            iqr = q3 - q1
+            left_bounds = q1 - 1.5 * iqr
+            right_bounds = q3 + 1.5 * iqr
+        elif self.method == "std":
+            mean = X_.mean()
+            std = X_.std()
+            left_bounds = mean - 3 * std
+            right_bounds = mean + 3 * std
+        elif self.method == "quantile":
+            quantiles = _get_quantiles(X_, [.01, .99], n_jobs=self.n_jobs)
+            left_bounds = quantiles.loc[.01]
+            right_bounds = quantiles.loc[.99]
+        elif self.method == "skip":
+            left_bounds = X_.min()
+            right_bounds = X_.max()
+        else:
+            raise ValueError(f"unknown method {self.method} for outlier remover")
+
+        X_ = X_.where(X_.ge(left_bounds) & X_.le(right_bounds))
+        self._lower_thresholds = X_.min()
+        self._upper_thresholds = X_.max()
+        self._col_thresholds = dict(zip(self.cols_to_transform, zip(self._lower_thresholds, self._upper_thresholds)))
 
         return self
 
     def transform(self, X):
         check_transform(X, fitted_item=self._col_thresholds, transformer_name=self.__class__.__name__)
-        X_ = X.copy()
-
-        for col in self.cols_to_transform:
-            X_[col] = X_[col].clip(*self._col_thresholds[col])
+        X_ = X.copy(deep=False)
+        dtypes = X[self.cols_to_transform].dtypes
+
+        if dtypes.nunique() == 1 and isinstance(dtypes.iloc[0], np.dtype) and dtypes.iloc[0].kind == "f":
+            # a single numpy float block is clipped as one contiguous array, NaN thresholds mean no bound as in pandas
+            X_[self.cols_to_transform] = np.clip(
+                X[self.cols_to_transform].to_numpy(),
+                self._lower_thresholds.fillna(-np.inf).to_numpy(),
+                self._upper_thresholds.fillna(np.inf).to_numpy(),
+            )
+        elif self._lower_thresholds.dtype == object or self._upper_thresholds.dtype == object:
+            # thresholds of mixed dtype kinds would upcast every clipped column to object, so clip one by one
+            for col in self.cols_to_transform:
+                X_[col] = X[col].clip(*self._col_thresholds[col])
+        else:
+            X_[self.cols_to_transform] = X[self.cols_to_transform].clip(
+                self._lower_thresholds, self._upper_thresholds, axis=1
+            )
 
         return X_
 
@@ -184,10 +205,17 @@ class WithAnotherColumnImputer(BaseEstimator, TransformerMixin):
 
     def transform(self, X):
         check_transform(X, fitted_item=self.cols_to_impute, transformer_name=self.__class__.__name__)
-        X_ = X.copy()
+        X_ = X.copy(deep=False)
+
+        cols = list(self.cols_to_impute)
+        source_cols = list(self.cols_to_impute.values())
 
-        for col in self.cols_to_impute:
-            X_[col] = X_[col].fillna(X_[self.cols_to_impute[col]])
+        if set(cols).isdisjoint(source_cols):
+            X_[cols] = X[cols].fillna(X[source_cols].set_axis(cols, axis=1))
+        else:
+            # chained imputations have to see the columns already imputed before them
+            for col in self.cols_to_impute:
+                X_[col] = X_[col].fillna(X_[self.cols_to_impute[col]])
 
         return X_
 
@@ -208,8 +236,9 @@ class CatCaster(BaseEstimator, TransformerMixin):
 
     def transform(self, X) -> pd.DataFrame:
         check_transform(X, is_check_fill=False)
-        X_ = X.copy()
-        X_[self.cols_to_cast] = X[self.cols_to_cast].astype("category")
+        X_ = X.copy(deep=False)
+        cols = [col for col in self.cols_to_cast if not isinstance(X[col].dtype, pd.CategoricalDtype)]
+        X_[cols] = X[cols].astype("category")
         return X_
 
 
@@ -226,7 +255,8 @@ class ColsOrder(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         check_fill(X)
         self._cols_order = [col for col in self.cols_order if col in X.columns]
-        self._cols_order += [col for col in X.columns if col not in self._cols_order]
+        ordered_cols = set(self._cols_order)
+        self._cols_order += [col for col in X.columns if col not in ordered_cols]
         return self
 
     def transform(self, X):
@@ -243,10 +273,13 @@ class ScalerPicker(BaseEstimator, TransformerMixin):
     :param scaler_type:
         "standard" - StandardScaler
         "minmax" - MinMaxScaler
+    :param dtype: dtype to cast scaled columns to, e.g. "float32" to halve their memory for the next steps.
+        None casts them to float64
     """
-    def __init__(self, cols_to_scale: list[str] = None, scaler_type: str = "standard"):
+    def __init__(self, cols_to_scale: list[str] = None, scaler_type: str = "standard", dtype: str = None):
         self.cols_to_scale = cols_to_scale
         self.scaler_type = scaler_type
+        self.dtype = dtype
         self._scaler = None
 
     def _get_scaler_class(self):
@@ -280,13 +313,12 @@ class ScalerPicker(BaseEstimator, TransformerMixin):
 
     def transform(self, X):
         check_transform(X, fitted_item=self._scaler, transformer_name=self.__class__.__name__)
-        X_ = X.copy()
+        X_ = X.copy(deep=False)
 
         if self._scaler == "skip":
             return X_
 
-        X_[self.cols_to_scale] = self._scaler.transform(X_[self.cols_to_scale])
-        X_[self.cols_to_scale] = X_[self.cols_to_scale].astype(float)
+        X_[self.cols_to_scale] = self._scaler.transform(X_[self.cols_to_scale]).astype(self.dtype or float)
 
         return X_
 
@@ -348,14 +380,7 @@ class SimpleImputerPicker(BaseEstimator, TransformerMixin):
             )
         elif self.strategy == "max":
             cols_to_impute = [col for col in self.cols_to_impute if col in X.columns]
-            self._imputer = {}
-
-            for col in cols_to_impute:
-                self._imputer[col] = (
-                    SimpleImputer(strategy="constant", fill_value=X[col].max(), keep_empty_features=True)
-                    .set_output(transform="pandas")
-                    .fit(X[[col]])
-                )
+            self._imputer = X[cols_to_impute].max()
         else:
             raise ValueError(f"unknown strategy {self.strategy} should be constant, mean, median or most_frequent")
 
@@ -363,15 +388,15 @@ class SimpleImputerPicker(BaseEstimator, TransformerMixin):
 
     def transform(self, X):
         check_transform(X, fitted_item=self._imputer, transformer_name=self.__class__.__name__)
-        X_ = X.copy()
+        X_ = X.copy(deep=False)
 
         if self.strategy == "constant":
             for cols, imputer in self._imputer.items():
                 cols = list(cols)
                 X_[cols] = imputer.transform(X_[cols])
         elif self.strategy == "max":
-            for col, imputer in self._imputer.items():
-                X_[col] = imputer.transform(X_[[col]])
+            cols = list(self._imputer.index)
+            X_[cols] = X_[cols].astype(float).fillna(self._imputer)
         else:
             X_[self.cols_to_impute] = self._imputer.transform(X_[self.cols_to_impute])
 
@@ -5,6 +5,11 @@ import os
 import numpy as np
 import pandas as pd
 
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
+
 
 def extract_years(start_ds: str | date | datetime, end_ds: str | date | datetime) -> list[int]:
     """
@@ -51,16 +56,14 @@ def extend_holidays_to_the_next_year(df: pd.DataFrame) -> pd.DataFrame:
     min_ds = df["ds"].max() - relativedelta(years=1)
     df_ = df[df["ds"] > min_ds]
 
-    new_rows = []
-    for _, row in df_.iterrows():
-        new_date = get_closest_same_day_of_week(row["ds"])
-        new_row = row.copy()
-        new_row["ds"] = new_date
-        new_rows.append(new_row)
+    shifted_ds = df_["ds"] + pd.DateOffset(years=1)
+    days_difference = (df_["ds"].dt.dayofweek - shifted_ds.dt.dayofweek) % 7
+    new_rows_df = df_.assign(ds=shifted_ds + pd.to_timedelta(days_difference, unit="D"))
 
-    df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+    df = pd.concat([df, new_rows_df], ignore_index=True)
+    df.sort_values(by="ds", kind="mergesort", inplace=True, ignore_index=True)
 
-    return df.sort_values(by="ds").reset_index(drop=True)
+    return df
 
 
 def get_local_sales(query: str) -> pd.DataFrame:
@@ -68,7 +71,12 @@ def get_local_sales(query: str) -> pd.DataFrame:
     if con is None:
         raise ValueError("DWH_PG_CON environment variable is not set")
 
-    sales_df = pd.read_sql(query, con=con)
+    if cx is not None:
+        # connectorx does not understand sqlalchemy driver suffixes like postgresql+psycopg2://
+        scheme, sep, rest = con.partition("://")
+        sales_df = cx.read_sql(scheme.split("+")[0] + sep + rest, query, return_type="pandas")
+    else:
+        sales_df = pd.read_sql(query, con=con)
     sales_df["lower_window"] = 0
 
     sales_df = sales_df[["holiday", "ds", "lower_window", "upper_window"]]
@@ -3,12 +3,14 @@ from sklearn.exceptions import NotFittedError
 
 
 def check_fill(X: any) -> None:
-    if not isinstance(X, pd.DataFrame):
+    # exact type check first, isinstance only for DataFrame subclasses
+    if type(X) is not pd.DataFrame and not isinstance(X, pd.DataFrame):
         raise ValueError("X is not pandas DataFrame")
 
 
 def check_transform(X: any, fitted_item: any = None, transformer_name: str = "", is_check_fill: bool = True) -> None:
-    check_fill(X)
+    if type(X) is not pd.DataFrame and not isinstance(X, pd.DataFrame):
+        raise ValueError("X is not pandas DataFrame")
 
     if is_check_fill and fitted_item is None:
         raise NotFittedError(f"{transformer_name} transformer was not fitted")
@@ -1,3 +1,5 @@
+import warnings
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -83,6 +85,24 @@ class TestCalendarExtractor:
         calculated = calendar_extractor.fit_transform(df)
         pd.testing.assert_frame_equal(expected, calculated, check_dtype=False)
 
+    def test_no_fragmentation_warning_on_fragmented_frame(self):
+        df = pd.DataFrame({"date": pd.to_datetime(["2022-01-01", "2023-02-28"])}, index=[10, 5])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+            for i in range(150):
+                df[f"col_{i}"] = [i, i]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", pd.errors.PerformanceWarning)
+            calculated = CalendarExtractor().fit_transform(df)
+        assert calculated["date_dayofyear"].tolist() == [1, 59]
+
+    def test_weekofyear_keeps_nullable_dtype(self):
+        df = pd.DataFrame({"date": pd.to_datetime(["2022-01-01", None]), "value": [1, 2]})
+        calculated = CalendarExtractor(calendar_level=6).fit_transform(df)
+        expected = pd.Series([52, None], dtype="UInt32", name="date_weekofyear")
+        pd.testing.assert_series_equal(expected, calculated["date_weekofyear"])
+
 
 class TestNoInfoColsRemover:
     @pytest.fixture(autouse=True)
@@ -116,6 +136,16 @@ class TestNoInfoColsRemover:
         calculated = t.fit_transform(self.df)
         pd.testing.assert_frame_equal(expected, calculated, check_dtype=False)
 
+    def test_keeps_column_that_differs_only_in_last_row(self):
+        df = pd.DataFrame(
+            {
+                "col_1": [1] * 2000 + [2],
+                "no_info_1": [1] * 2001,
+            }
+        )
+        calculated = NoInfoColsRemover().fit_transform(df)
+        assert list(calculated.columns) == ["col_1"]
+
     def test_raise_error_if_wrong_type_in_fit(self):
         with pytest.raises(ValueError) as excinfo:
             NoInfoColsRemover().fit("wrong_type")
@@ -178,6 +208,52 @@ class TestOutlierRemover:
         calculated = outlier_remover.fit_transform(df)
         pd.testing.assert_frame_equal(expected, calculated, check_dtype=False)
 
+    @pytest.mark.parametrize(
+        "input_data, method",
+        [
+            (
+                {"col_1": [True, False, True, True], "col_2": [1., 2., 3., 50.]},
+                "std",
+            ),
+            (
+                {"col_1": pd.to_datetime(["2020-01-01", "2021-01-01", "2022-01-01"]), "col_2": [1., 2., 3.]},
+                "skip",
+            ),
+        ],
+        ids=[
+            "bool_and_float",
+            "datetime_and_float",
+        ],
+    )
+    def test_mixed_dtype_kinds_keep_dtypes(self, input_data, method):
+        df = pd.DataFrame(input_data)
+        calculated = OutlierRemover(method=method, cols_to_transform=["col_1", "col_2"]).fit_transform(df)
+        pd.testing.assert_series_equal(df.dtypes, calculated.dtypes)
+
+    def test_nullable_float_columns_with_na(self):
+        df = pd.DataFrame({"col_1": [1., 2., None, 3., 100.], "col_2": [1., 2., 4., 3., 100.]}).astype("Float64")
+        expected = pd.DataFrame({"col_1": [1., 2., None, 3., 3.], "col_2": [1., 2., 4., 3., 4.]}).astype("Float64")
+        calculated = OutlierRemover(cols_to_transform=["col_1", "col_2"]).fit_transform(df)
+        pd.testing.assert_frame_equal(expected, calculated)
+
+    def test_nan_thresholds_do_not_clip(self):
+        outlier_remover = OutlierRemover(method="std", cols_to_transform=["col_1"]).fit(pd.DataFrame({"col_1": [1.]}))
+        df = pd.DataFrame({"col_1": [1., 5., -3.]})
+        calculated = outlier_remover.transform(df)
+        pd.testing.assert_frame_equal(df, calculated)
+
+    @pytest.mark.parametrize("method", ["iqr", "quantile"])
+    def test_wide_frame_matches_column_by_column(self, method):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.standard_t(2, size=(200, 40))).add_prefix("col_")
+        t = OutlierRemover(method=method, cols_to_transform=list(df.columns), n_jobs=2)
+        calculated = t.fit_transform(df)
+        expected = pd.concat(
+            [OutlierRemover(method=method, cols_to_transform=[col]).fit_transform(df[[col]]) for col in df.columns],
+            axis=1,
+        )
+        pd.testing.assert_frame_equal(expected, calculated)
+
     def test_can_catch_method_error(self):
         df = pd.DataFrame({"col_1": [1]})
         with pytest.raises(ValueError) as excinfo:
@@ -206,6 +282,32 @@ class TestWithAnotherColumnImputer:
         calculated = imputer.fit_transform(self.df)
         pd.testing.assert_frame_equal(expected, calculated, check_dtype=False)
 
+    def test_impute_several_columns(self):
+        df = pd.DataFrame(
+            {
+                "col_1": [1, 2, 3],
+                "col_2": [5, None, None],
+                "col_3": ["a", "b", "c"],
+                "col_4": [None, "y", None],
+            }
+        )
+        imputer = WithAnotherColumnImputer(cols_to_impute={"col_2": "col_1", "col_4": "col_3"})
+        expected = pd.DataFrame(
+            {
+                "col_1": [1, 2, 3],
+                "col_2": [5, 2, 3],
+                "col_3": ["a", "b", "c"],
+                "col_4": ["a", "y", "c"],
+            }
+        )
+        calculated = imputer.fit_transform(df)
+        pd.testing.assert_frame_equal(expected, calculated, check_dtype=False)
+
+    def test_input_is_not_modified(self):
+        expected = self.df.copy()
+        WithAnotherColumnImputer(cols_to_impute={"col_2": "col_1"}).fit_transform(self.df)
+        pd.testing.assert_frame_equal(expected, self.df)
+
 
 class TestCatCaster:
     @pytest.fixture(autouse=True)
@@ -296,6 +398,19 @@ class TestScalerPicker:
         calculated = t.fit_transform(df)
         pd.testing.assert_frame_equal(expected, calculated, check_dtype=False, rtol=.0001)
 
+    def test_float32_input_is_scaled_to_float64_by_default(self):
+        df = pd.DataFrame({"col_1": np.arange(5, dtype="float32")})
+        calculated = ScalerPicker().fit_transform(df)
+        assert calculated["col_1"].dtype == "float64"
+
+    def test_dtype_param(self):
+        df = pd.DataFrame({"col_1": range(1, 12), "col_2": range(10, 21), "col_3": range(11)})
+        t = ScalerPicker(scaler_type="minmax", cols_to_scale=["col_1", "col_2"], dtype="float32")
+        calculated = t.fit_transform(df)
+        assert calculated[["col_1", "col_2"]].dtypes.eq("float32").all()
+        assert calculated["col_3"].dtype == "int64"
+        np.testing.assert_allclose(calculated["col_1"], np.linspace(0, 1, 11), rtol=1e-6)
+
     def test_can_catch_method_error(self):
         df = pd.DataFrame({"col_1": [1]})
         with pytest.raises(ValueError) as excinfo:
@@ -370,6 +485,14 @@ class TestSimpleImputerPicker:
         calculated = t.fit_transform(df)
         pd.testing.assert_frame_equal(expected, calculated, check_dtype=False)
 
+    def test_max_impute_object_column_without_warning(self):
+        df = pd.DataFrame({"col_1": pd.Series([None, 1, 2], dtype=object), "col_2": [1, None, 3]})
+        expected = pd.DataFrame({"col_1": [2., 1., 2.], "col_2": [1., 3., 3.]})
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            calculated = SimpleImputerPicker(strategy="max", cols_to_impute=["col_1", "col_2"]).fit_transform(df)
+        pd.testing.assert_frame_equal(expected, calculated)
+
     def test_can_catch_wrong_strategy(self):
         with pytest.raises(ValueError) as excinfo:
             df = self.df_nan.copy()